@@ -0,0 +1,148 @@
+# app/cache.py
+from __future__ import annotations
+import os
+import threading
+from typing import Callable, Dict, Hashable, Optional
+
+from cachetools import TTLCache
+import redis
+import redis.asyncio
+from starlette.concurrency import run_in_threadpool
+
+# ------------------------------------------------------------------------------
+# Cache of serialized layer responses (JSON bytes), per tenant.
+#
+# With REDIS_URL set the cache lives in Redis and is shared by all workers;
+# otherwise each process keeps its own in-memory cache.
+#
+# Env:
+#   REDIS_URL          e.g. redis://localhost:6379/0 (optional)
+#   REDIS_TIMEOUT      connect/read timeout in seconds, default 0.5
+#   LAYER_CACHE_TTL    seconds an entry is served, default 30
+#   LAYER_CACHE_SIZE   max entries across all tenants, default 1024 (in-process)
+# ------------------------------------------------------------------------------
+
+
+class LayerCache:
+    """
+    TTL cache keyed by (tenant, generation, key).
+
+    invalidate(tenant) bumps the tenant's generation instead of deleting
+    entries: a read that started before a write stores its (old) body under
+    the old generation, where nobody will look it up again.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._lock = threading.Lock()
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generations: Dict[str, int] = {}
+
+    async def get_or_load(
+        self, tenant: str, key: Hashable, load: Callable[[], Optional[bytes]]
+    ) -> Optional[bytes]:
+        """
+        Return the cached body, or run the (blocking) load() in the threadpool
+        and cache a non-None result. Hits never leave the event loop.
+        """
+        slug = (tenant or "default").lower()
+        with self._lock:
+            entry_key = (slug, self._generations.get(slug, 0), key)
+            body = self._entries.get(entry_key)
+        if body is None:
+            body = await run_in_threadpool(load)
+            if body is not None:
+                with self._lock:
+                    self._entries[entry_key] = body
+        return body
+
+    def invalidate(self, tenant: str) -> None:
+        """Forget everything cached for this tenant (call after writes)."""
+        slug = (tenant or "default").lower()
+        with self._lock:
+            self._generations[slug] = self._generations.get(slug, 0) + 1
+
+    async def start(self) -> None:
+        """Nothing to connect for the in-process cache (see RedisLayerCache)."""
+
+    async def close(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisLayerCache:
+    """
+    LayerCache backed by Redis, so one DB read serves every worker.
+
+    Same generation scheme: the tenant's generation is a counter key
+    (layers:<tenant>:gen) that invalidate() INCRs; bodies are stored under
+    layers:<tenant>:<gen>:<key> with a TTL. If Redis is unavailable, reads
+    fall through to load() instead of failing the request.
+    """
+
+    def __init__(self, url: str, ttl: float, timeout: float) -> None:
+        self._url = url
+        self._ttl = max(1, int(ttl))
+        self._timeout = timeout
+        self._redis: Optional[redis.asyncio.Redis] = None  # reads (event loop)
+        self._redis_sync: Optional[redis.Redis] = None  # writes (sync handlers)
+
+    async def start(self) -> None:
+        """Create the clients (app startup); until then reads go to load()."""
+        # short timeouts: an unreachable or stalled Redis must cost a request
+        # at most REDIS_TIMEOUT, not the OS TCP timeout
+        opts = {
+            "socket_timeout": self._timeout,
+            "socket_connect_timeout": self._timeout,
+        }
+        self._redis = redis.asyncio.Redis.from_url(self._url, **opts)
+        self._redis_sync = redis.Redis.from_url(self._url, **opts)
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.aclose()
+        if self._redis_sync is not None:
+            self._redis_sync.close()
+        self._redis = self._redis_sync = None
+
+    async def get_or_load(
+        self, tenant: str, key: Hashable, load: Callable[[], Optional[bytes]]
+    ) -> Optional[bytes]:
+        slug = (tenant or "default").lower()
+        if self._redis is None:
+            return await run_in_threadpool(load)
+        try:
+            gen = int(await self._redis.get(f"layers:{slug}:gen") or 0)
+            entry_key = f"layers:{slug}:{gen}:{key}"
+            body = await self._redis.get(entry_key)
+        except redis.RedisError:
+            return await run_in_threadpool(load)
+        if body is None:
+            body = await run_in_threadpool(load)
+            if body is not None:
+                try:
+                    await self._redis.set(entry_key, body, ex=self._ttl)
+                except redis.RedisError:
+                    pass
+        return body
+
+    def invalidate(self, tenant: str) -> None:
+        slug = (tenant or "default").lower()
+        if self._redis_sync is None:
+            print(f"[CACHE WARN] tenant={slug} invalidation skipped: not started")
+            return
+        try:
+            self._redis_sync.incr(f"layers:{slug}:gen")
+        except redis.RedisError as e:
+            # the write itself succeeded; entries expire after the TTL anyway
+            print(f"[CACHE WARN] tenant={slug} invalidation failed: {e}")
+
+
+def _make_layer_cache():
+    ttl = float(os.getenv("LAYER_CACHE_TTL", "30"))
+    url = os.getenv("REDIS_URL")
+    if url:
+        return RedisLayerCache(url, ttl, float(os.getenv("REDIS_TIMEOUT", "0.5")))
+    return LayerCache(maxsize=int(os.getenv("LAYER_CACHE_SIZE", "1024")), ttl=ttl)
+
+
+layer_cache = _make_layer_cache()
@@ -1,38 +1,184 @@
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Mapping, Optional
+
+from sqlalchemy import (
+    bindparam,
+    case,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session, raiseload
+from sqlalchemy.types import JSON
 
 from app.models import models
 from app.schemas.layers import LayerCreate, LayerUpdate
+from app.serialization import RawJSON
+
+# Built once at import; SQLAlchemy caches the compiled form per engine, so
+# repeated calls skip both statement construction and SQL compilation.
+# ORM reads use raiseload("*"): if Layer ever gains a relationship, touching
+# it during serialization raises instead of silently lazy-loading per row.
+# Row reads feed app/serialization.py only: JSON columns come back as raw
+# text (RawJSON) rather than being parsed into dicts by the driver.
+_LAYER_COLUMNS_STMT = select(
+    *(
+        cast(c, RawJSON).label(c.key) if isinstance(c.type, JSON) else c
+        for c in models.Layer.__table__.columns
+    )
+)
+_GET_LAYER_STMT = (
+    select(models.Layer)
+    .options(raiseload("*"))
+    .where(models.Layer.id == bindparam("layer_id"))
+)
+_GET_LAYER_ROW_STMT = _LAYER_COLUMNS_STMT.where(
+    models.Layer.id == bindparam("layer_id")
+)
+_GET_LAYER_ROWS_STMT = _LAYER_COLUMNS_STMT.where(
+    models.Layer.id.in_(bindparam("layer_ids", expanding=True))
+).order_by(func.coalesce(models.Layer.sort_order, 0), models.Layer.id)
+# "fetch": the default evaluator can't resolve the bind parameter and would
+# leave a deleted Layer in the session's identity map
+_DELETE_LAYER_STMT = (
+    delete(models.Layer)
+    .where(models.Layer.id == bindparam("layer_id"))
+    .returning(models.Layer)
+    .execution_options(synchronize_session="fetch")
+)
+_LAYER_COLUMNS = frozenset(models.Layer.__table__.columns.keys())
+
+
+def _column_values(values: Mapping[str, Any]) -> Dict[str, Any]:
+    # The schema carries a few fields the table does not have (e.g. style).
+    return {k: v for k, v in values.items() if k in _LAYER_COLUMNS}
+
 
+def _layers_filtered_stmt(viewer_id: Optional[int], include_hidden: bool):
+    stmt = _LAYER_COLUMNS_STMT
+    if viewer_id is not None:
+        stmt = stmt.where(models.Layer.viewer_id == viewer_id)
+    if not include_hidden:
+        stmt = stmt.where(
+            or_(models.Layer.visible.is_(None), models.Layer.visible.is_(True))
+        )
+    return stmt.order_by(func.coalesce(models.Layer.sort_order, 0), models.Layer.id)
 
-def get_layers(db: Session):
-    return db.query(models.Layer).all()
+
+def iter_layer_batches(
+    db: Session,
+    viewer_id: Optional[int] = None,
+    include_hidden: bool = True,
+    batch_size: int = 500,
+):
+    """
+    Column mappings (no ORM instances) for read-only serialization, filtered
+    and ordered in SQL so Postgres can use layers_viewer_sort_idx. Rows are
+    read through a server-side cursor and yielded batch_size mappings at a
+    time, so large catalogs are never fully materialized as Python rows.
+
+    JSON columns hold orjson.Fragment values (see RawJSON), meant for
+    app/serialization.py only: pydantic and the json module can't encode them.
+    """
+    stmt = _layers_filtered_stmt(viewer_id, include_hidden)
+    stmt = stmt.execution_options(yield_per=batch_size)
+    yield from db.execute(stmt).mappings().partitions()
 
 
 def get_layer(db: Session, layer_id: int):
-    return db.query(models.Layer).filter(models.Layer.id == layer_id).first()
+    return db.execute(_GET_LAYER_STMT, {"layer_id": layer_id}).scalar_one_or_none()
+
+
+def get_layer_row(db: Session, layer_id: int):
+    """Column mapping for one layer (no ORM instance), or None."""
+    return db.execute(_GET_LAYER_ROW_STMT, {"layer_id": layer_id}).mappings().first()
+
+
+def get_layer_rows(db: Session, layer_ids: List[int]):
+    """Column mappings for several layers in one WHERE id IN (...) query."""
+    if not layer_ids:
+        return []
+    params = {"layer_ids": list(layer_ids)}
+    return db.execute(_GET_LAYER_ROWS_STMT, params).mappings().all()
 
 
 def create_layer(db: Session, layer: LayerCreate):
-    db_layer = models.Layer(**layer.dict())
-    db.add(db_layer)
+    return create_layers_bulk(db, [layer])[0]
+
+
+def create_layers_bulk(db: Session, layers: List[LayerCreate]):
+    """Insert all layers with one INSERT ... RETURNING (no refresh SELECT)."""
+    if not layers:
+        return []
+    # rows come back in the order the layers were sent (insertmanyvalues batches
+    # don't guarantee that otherwise)
+    stmt = insert(models.Layer).returning(models.Layer, sort_by_parameter_order=True)
+    rows = db.execute(stmt, [_column_values(l.dict()) for l in layers]).scalars().all()
     db.commit()
-    db.refresh(db_layer)
-    return db_layer
+    return rows
 
 
 def update_layer(db: Session, layer_id: int, layer: LayerUpdate):
-    db_layer = db.query(models.Layer).filter(models.Layer.id == layer_id).first()
-    if db_layer:
-        for key, value in layer.dict(exclude_unset=True).items():
-            setattr(db_layer, key, value)
+    """Apply the set fields with one UPDATE ... RETURNING (no SELECT/refresh)."""
+    values = _column_values(layer.dict(exclude_unset=True))
+    if not values:
+        return get_layer(db, layer_id)
+    stmt = (
+        update(models.Layer)
+        .where(models.Layer.id == layer_id)
+        .values(**values)
+        .returning(models.Layer)
+    )
+    db_layer = db.execute(stmt).scalar_one_or_none()
+    if db_layer is not None:
         db.commit()
-        db.refresh(db_layer)
     return db_layer
 
 
+def update_layers_bulk(db: Session, changes: Mapping[int, Mapping[str, Any]]):
+    """
+    Update many layers in a single statement, e.g. from admin scripts:
+        update_layers_bulk(db, {1: {"sort_order": 10}, 2: {"visible": False}})
+    Each column becomes CASE id WHEN ... THEN ... ELSE <column> END, so ids
+    that don't touch a column keep their current value.
+    """
+    per_id = {i: _column_values(v) for i, v in changes.items()}
+    per_id = {i: v for i, v in per_id.items() if v}
+    if not per_id:
+        return []
+    columns = {key for v in per_id.values() for key in v}
+    table = models.Layer.__table__
+    values = {
+        key: case(
+            {
+                i: literal(v[key], table.c[key].type)
+                for i, v in per_id.items()
+                if key in v
+            },
+            value=table.c.id,
+            else_=table.c[key],
+        )
+        for key in columns
+    }
+    stmt = (
+        update(models.Layer)
+        .where(models.Layer.id.in_(per_id))
+        .values(values)
+        .returning(models.Layer)
+    )
+    rows = db.execute(stmt).scalars().all()
+    db.commit()
+    return rows
+
+
 def delete_layer(db: Session, layer_id: int):
-    db_layer = db.query(models.Layer).filter(models.Layer.id == layer_id).first()
-    if db_layer:
-        db.delete(db_layer)
+    """Delete with one DELETE ... RETURNING; returns the removed row or None."""
+    result = db.execute(_DELETE_LAYER_STMT, {"layer_id": layer_id})
+    db_layer = result.scalar_one_or_none()
+    if db_layer is not None:
         db.commit()
     return db_layer
@@ -1,6 +1,7 @@
 # app/database.py
 from __future__ import annotations
 from contextlib import contextmanager
+from functools import lru_cache
 import json
 import os
 import socket
@@ -11,8 +12,14 @@ from urllib.parse import urlsplit, urlunsplit
 from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool
 import yaml
 
+try:  # libyaml-backed loader when PyYAML was built with it
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 # ------------------------------------------------------------------------------
 # SQLAlchemy base (models import this)
 # ------------------------------------------------------------------------------
@@ -44,6 +51,42 @@ def _normalize_host(dsn: str) -> str:
     return dsn
 
 
+@lru_cache(maxsize=8)
+def _parse_yaml(path: str, mtime: float) -> dict:
+    """
+    Parse a tenants file once per (path, mtime). Unchanged files are served
+    from memory; touching the file changes the key and forces a reparse.
+    The returned dict is shared, so callers must not mutate it.
+    """
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=_SafeLoader) or {}
+
+
+def _tenants_from_yaml(data: dict) -> Dict[str, str]:
+    mapping: Dict[str, str] = {}
+    tenants = data.get("tenants", data) or {}
+    if isinstance(tenants, dict):
+        # mapping form
+        for k, v in tenants.items():
+            if isinstance(v, dict) and "dsn" in v:
+                mapping[k.lower()] = _normalize_host(str(v["dsn"]))
+            elif isinstance(v, str):
+                mapping[k.lower()] = _normalize_host(v)
+    elif isinstance(tenants, list):
+        # list form
+        for item in tenants:
+            if not isinstance(item, dict):
+                continue
+            slug = str(item.get("slug") or "").lower()
+            dsn = item.get("dsn") or item.get("url")
+            if slug and dsn:
+                mapping[slug] = _normalize_host(str(dsn))
+    else:
+        # unknown shape -> ignore
+        pass
+    return mapping
+
+
 # ------------------------------------------------------------------------------
 # Tenant registry: maps tenant slug -> DSN
 #
@@ -60,6 +103,8 @@ def _normalize_host(dsn: str) -> str:
 #   2) TENANT_DSN_MAP='{"brandweer":"postgresql://...","vik":"postgresql://..."}'
 #   3) TENANT_<SLUG>_DSN env vars, e.g. TENANT_BRANDWEER_DSN=postgresql://...
 # Fallback (single-tenant): DATABASE_URL -> slug 'default'
+# The YAML file is re-read when its mtime changes; env sources (2, 3 and the
+# fallback) are read at startup and on refresh() only.
 # ------------------------------------------------------------------------------
 
 
@@ -69,43 +114,19 @@ class TenantRegistry:
         self._map: Dict[str, str] = {}
         self._yaml_path = path or os.getenv("CATALOG_TENANTS_FILE", "tenants.yaml")
         self._yaml_mtime: Optional[float] = None
+        self._load_env()
         self._load_all()
 
     # ---- loaders ----
 
     def _load_yaml(self) -> Dict[str, str]:
-        mapping: Dict[str, str] = {}
         if not self._yaml_path:
-            return mapping
+            return {}
         try:
             mt = os.path.getmtime(self._yaml_path)
         except FileNotFoundError:
-            return mapping
-
-        with open(self._yaml_path, "r") as f:
-            data = yaml.safe_load(f) or {}
-
-        tenants = data.get("tenants", data) or {}
-        if isinstance(tenants, dict):
-            # mapping form
-            for k, v in tenants.items():
-                if isinstance(v, dict) and "dsn" in v:
-                    mapping[k.lower()] = _normalize_host(str(v["dsn"]))
-                elif isinstance(v, str):
-                    mapping[k.lower()] = _normalize_host(v)
-        elif isinstance(tenants, list):
-            # list form
-            for item in tenants:
-                if not isinstance(item, dict):
-                    continue
-                slug = str(item.get("slug") or "").lower()
-                dsn = item.get("dsn") or item.get("url")
-                if slug and dsn:
-                    mapping[slug] = _normalize_host(str(dsn))
-        else:
-            # unknown shape -> ignore
-            pass
-
+            return {}
+        mapping = _tenants_from_yaml(_parse_yaml(self._yaml_path, mt))
         self._yaml_mtime = mt
         return mapping
 
@@ -139,44 +160,48 @@ class TenantRegistry:
             mapping["default"] = _normalize_host(default)
         return mapping
 
+    def _load_env(self) -> None:
+        # Snapshot env once (startup / refresh) instead of scanning os.environ
+        # on every YAML reload.
+        overlay = self._load_env_json()
+        overlay.update(self._load_env_vars())
+        self._env_overlay: Dict[str, str] = overlay
+        self._env_default: Optional[str] = self._load_default_single().get("default")
+
     def _load_all(self) -> None:
         # base from YAML
         m = self._load_yaml()
-        # overlay env JSON
-        m.update(self._load_env_json())
-        # overlay per-tenant env
-        m.update(self._load_env_vars())
+        # overlay env JSON + per-tenant env
+        m.update(self._env_overlay)
         # add default (single-tenant) only if not already set
-        m.setdefault("default", self._load_default_single().get("default", None))
+        m.setdefault("default", self._env_default)
         # remove None values
         self._map = {k: v for k, v in m.items() if v}
 
     # ---- public API ----
 
     def _maybe_reload_yaml(self) -> None:
+        # fast path: one stat() and a float compare, no lock
         if not self._yaml_path:
             return
         try:
             mt = os.path.getmtime(self._yaml_path)
         except FileNotFoundError:
             return
-        if self._yaml_mtime is None or mt != self._yaml_mtime:
-            # only re-merge YAML; keep env overlays
-            with self._lock:
-                yaml_map = self._load_yaml()
+        if mt == self._yaml_mtime:
+            return
+        with self._lock:
+            # another request may have reloaded while we waited
+            if mt != self._yaml_mtime:
                 # rebuild with overlays to keep precedence rules
-                base = yaml_map
-                base.update(self._load_env_json())
-                base.update(self._load_env_vars())
-                base.setdefault(
-                    "default", self._load_default_single().get("default", None)
-                )
-                self._map = {k: v for k, v in base.items() if v}
+                self._load_all()
 
     def refresh(self) -> None:
         """Force full reload of YAML + env."""
         with self._lock:
             self._yaml_mtime = None
+            _parse_yaml.cache_clear()
+            self._load_env()
             self._load_all()
 
     def get_dsn(self, tenant: Optional[str]) -> str:
@@ -210,21 +235,51 @@ _engines: Dict[str, Engine] = {}
 _sessions: Dict[str, sessionmaker] = {}
 
 
+# Pool settings (env):
+#   DB_POOL_CLASS      "queue" (default) or "null" (no client-side pooling,
+#                      e.g. when PgBouncer already pools for us)
+#   DB_POOL_SIZE       default 5
+#   DB_MAX_OVERFLOW    default 5
+#   DB_POOL_TIMEOUT    seconds to wait for a free connection, default 30
+#   DB_POOL_RECYCLE    seconds before a pooled connection is replaced, default 60
+#   DB_POOL_PRE_PING   "true" to ping on every checkout, default off
+#   DB_QUERY_CACHE_SIZE  compiled-statement cache entries per engine, default 1200
+#
+# Pre-ping is only safe against direct Postgres or session-mode PgBouncer. In
+# transaction mode the ping opens an implicit transaction that pins a server
+# connection, so we rely on a short pool_recycle for staleness instead.
 def _create_engine(dsn: str) -> Engine:
-    # Tune pooling for small services; ensure pre_ping to avoid stale connections.
+    pool_class = os.getenv("DB_POOL_CLASS", "queue").lower()
+    pre_ping = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+    query_cache_size = int(os.getenv("DB_QUERY_CACHE_SIZE", "1200"))
+    if pool_class == "null":
+        return create_engine(
+            dsn,
+            poolclass=NullPool,
+            pool_pre_ping=pre_ping,
+            query_cache_size=query_cache_size,
+            future=True,
+        )
     return create_engine(
         dsn,
         pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
         max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "5")),
-        pool_pre_ping=True,
-        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "300")),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_pre_ping=pre_ping,
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "60")),
+        query_cache_size=query_cache_size,
         future=True,
     )
 
 
 def _get_engine_for_tenant(tenant: str) -> Engine:
     slug = (tenant or "default").lower()
+    # fast path: plain dict read (atomic under the GIL), no lock once warm
+    engine = _engines.get(slug)
+    if engine is not None:
+        return engine
     with _engine_lock:
+        # re-check: another thread may have built it while we waited
         if slug in _engines:
             return _engines[slug]
         dsn = _registry.get_dsn(slug)
@@ -239,10 +294,19 @@ def _get_engine_for_tenant(tenant: str) -> Engine:
                 cur.execute("select to_regclass('public.layers'), to_regclass('layers')")
                 print(f"[DB DEBUG] tenant={slug} table vis:",
                       cur.fetchone())  # e.g. ('public.layers', 'public.layers') or (None, None)
-        _engines[slug] = engine
+        # publish the sessionmaker first: lock-free readers that see the
+        # engine rely on _sessions[slug] already being there
+        # expire_on_commit=False: CRUD helpers commit and then return rows
+        # loaded via RETURNING; expiring them would re-SELECT on serialization
+        # (and fail outright for deleted rows)
         _sessions[slug] = sessionmaker(
-            bind=engine, autoflush=False, autocommit=False, future=True
+            bind=engine,
+            autoflush=False,
+            autocommit=False,
+            expire_on_commit=False,
+            future=True,
         )
+        _engines[slug] = engine
         return engine
 
 
@@ -258,6 +322,16 @@ def dispose_all_engines() -> None:
         _sessions.clear()
 
 
+def _get_sessionmaker(tenant: str) -> sessionmaker:
+    slug = (tenant or "default").lower()
+    # warm tenants: one dict read; only a tenant added after startup builds
+    SessionLocal = _sessions.get(slug)
+    if SessionLocal is None:
+        _get_engine_for_tenant(slug)
+        SessionLocal = _sessions[slug]
+    return SessionLocal
+
+
 # ------------------------------------------------------------------------------
 # FastAPI-style dependencies (generators)
 # ------------------------------------------------------------------------------
@@ -269,8 +343,7 @@ def get_db() -> Generator[Session, None, None]:
     Uses DATABASE_URL or TENANT_DSN_MAP['default'].
     Keep this for legacy routes not yet tenant-scoped.
     """
-    _get_engine_for_tenant("default")
-    SessionLocal = _sessions["default"]
+    SessionLocal = _get_sessionmaker("default")
     db = SessionLocal()
     try:
         yield db
@@ -278,13 +351,17 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
-def get_tenant_session(tenant: str) -> Generator[Session, None, None]:
+@contextmanager
+def tenant_session(tenant: str) -> Generator[Session, None, None]:
+    """
+    Same as get_tenant_session, usable as `with tenant_session(t) as db:` in
+    handlers that only need the DB some of the time (e.g. on a cache miss).
+    """
     # 1) normalize
     slug = (tenant or "default").lower()
 
-    # 2) ensure we have an engine+sessionmaker for this tenant
-    _get_engine_for_tenant(slug)
-    SessionLocal = _sessions[slug]
+    # 2) engines are warmed at startup; this only builds one for a new tenant
+    SessionLocal = _get_sessionmaker(slug)
     db = SessionLocal()
 
     # 3) open a transaction, set search_path, keep it open for the request
@@ -293,14 +370,22 @@ def get_tenant_session(tenant: str) -> Generator[Session, None, None]:
         # SET LOCAL applies only to this transaction (works with pgbouncer)
         db.execute(text(f'SET LOCAL search_path = "{slug}", public'))
         yield db
-        trans.commit()
+        # CRUD helpers may already have committed this transaction
+        if trans.is_active:
+            trans.commit()
     except Exception:
-        trans.rollback()
+        if trans.is_active:
+            trans.rollback()
         raise
     finally:
         db.close()
 
 
+def get_tenant_session(tenant: str) -> Generator[Session, None, None]:
+    with tenant_session(tenant) as db:
+        yield db
+
+
 # ------------------------------------------------------------------------------
 # Helpers you might use in admin/ops scripts
 # ------------------------------------------------------------------------------
@@ -309,3 +394,25 @@ def get_tenant_session(tenant: str) -> Generator[Session, None, None]:
 def list_tenant_dsns() -> Iterable[Tuple[str, str]]:
     """Return (tenant, dsn) pairs currently configured."""
     return [(t, _registry.get_dsn(t)) for t in sorted(_registry.tenants())]
+
+
+def warm_engines() -> None:
+    """Build engine + sessionmaker for every configured tenant (app startup)."""
+    for slug in _registry.tenants():
+        try:
+            _get_engine_for_tenant(slug)
+        except Exception as e:
+            # a bad DSN should only break that tenant, not the whole app
+            print(f"[DB WARN] tenant={slug} engine not created: {e}")
+
+
+def list_tenants() -> Iterable[str]:
+    return sorted(_registry.tenants())
+
+
+def refresh_tenants() -> Iterable[str]:
+    """Reload tenant config, drop cached engines and warm them again."""
+    _registry.refresh()
+    dispose_all_engines()
+    warm_engines()
+    return list_tenants()
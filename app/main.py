@@ -1,12 +1,32 @@
 # app/main.py
 from __future__ import annotations
+from contextlib import asynccontextmanager
 
+from app.cache import layer_cache
+from app.database import dispose_all_engines, warm_engines
+from app.routes.admin import ADMIN_TOKEN, router as admin_router
 from app.routes.config import router as config_router
 from app.routes.layers import router as layers_router
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
-app = FastAPI(title="Geoviewer Viewer API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # build all tenant engines up front so requests never take the engine lock
+    warm_engines()
+    await layer_cache.start()
+    yield
+    await layer_cache.close()
+    dispose_all_engines()
+
+
+app = FastAPI(
+    title="Geoviewer Viewer API",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # (optional) CORS
 app.add_middleware(
@@ -21,6 +41,8 @@ app.add_middleware(
 # mount routers
 app.include_router(layers_router, prefix="/tenants/{tenant}/layers", tags=["layers"])
 app.include_router(config_router, prefix="/tenants/{tenant}/config", tags=["config"])
+if ADMIN_TOKEN:  # admin endpoints are off unless a token is configured
+    app.include_router(admin_router, prefix="/admin", tags=["admin"])
 # app.include_router(users_router, prefix="/tenants/{tenant}/users", tags=["users"])
 # app.include_router(viewers_router, prefix="/tenants/{tenant}/viewers", tags=["viewers"])
 
@@ -1,10 +1,11 @@
-from sqlalchemy import Column, DateTime, func, Integer, String, Boolean, Text, JSON, Float
+from sqlalchemy import Column, DateTime, func, Index, Integer, String, Boolean, Text, JSON, Float
 from app.database import Base
 
 class Layer(Base):
     __tablename__ = "layers"
 
     id = Column(Integer, primary_key=True, index=True)
+    viewer_id = Column(Integer)
     type = Column(String)
     name = Column(String)
     title = Column(String)
@@ -24,3 +25,8 @@ class Layer(Base):
     bbox = Column(JSON)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    # matches the /config query: WHERE viewer_id = ? ORDER BY coalesce(sort_order, 0), id
+    __table_args__ = (
+        Index("layers_viewer_sort_idx", viewer_id, func.coalesce(sort_order, 0), id),
+    )
+
@@ -1,6 +1,6 @@
 # === app/providers/base.py ===
 from __future__ import annotations
-from dataclasses import asdict, dataclass, field
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
@@ -123,6 +123,18 @@ class Access:
         else:
             raise ValueError(f"Unknown access mode: {self.mode}")
 
+    def to_dict(self) -> Dict[str, Any]:
+        # Built by hand: dataclasses.asdict deep-copies every nested mapping.
+        return {
+            "mode": self.mode.value,
+            "provider": self.provider.value,
+            "endpoint": self.endpoint,
+            "auth": self.auth.value if self.auth else None,
+            "proxy_url": self.proxy_url,
+            "read": dict(self.read),
+            "write": dict(self.write) if self.write is not None else None,
+        }
+
 
 # ----------------------------
 # Layer definition for the catalog
@@ -156,15 +168,17 @@ class LayerConfig:
         self.access.validate()
 
     def to_dict(self) -> Dict[str, Any]:  # handy for JSON responses
-        d = asdict(self)
-        # Enums → plain strings
-        d["type"] = self.type.value
-        d["geometry"] = self.geometry.value
-        d["access"]["mode"] = self.access.mode.value
-        d["access"]["provider"] = self.access.provider.value
-        if d["access"].get("auth"):
-            d["access"]["auth"] = self.access.auth.value  # type: ignore[union-attr]
-        return d
+        # Enums → plain strings; mappings are shallow-copied, not deep-copied
+        return {
+            "id": self.id,
+            "title": self.title,
+            "type": self.type.value,
+            "geometry": self.geometry.value,
+            "access": self.access.to_dict(),
+            "order": self.order,
+            "visible": self.visible,
+            "style": dict(self.style),
+        }
 
 
 @dataclass(frozen=True)
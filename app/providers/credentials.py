@@ -1,7 +1,8 @@
 # === app/providers/credentials.py ===
 from __future__ import annotations
 import base64
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 import os
 from typing import Dict, Mapping, Optional, Tuple
 
@@ -28,9 +29,13 @@ class Credentials:
 @dataclass
 class BearerToken(Credentials):
     token: str
+    _header: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._header = f"Bearer {self.token}"
 
     def apply(self, headers: Dict[str, str], params: Dict[str, str]) -> None:
-        headers["Authorization"] = f"Bearer {self.token}"
+        headers["Authorization"] = self._header
 
     def __repr__(self) -> str:
         return "BearerToken(token=***redacted***)"
@@ -40,10 +45,15 @@ class BearerToken(Credentials):
 class BasicAuth(Credentials):
     username: str
     password: str
+    _header: str = field(init=False, repr=False, compare=False)
 
-    def apply(self, headers: Dict[str, str], params: Dict[str, str]) -> None:
+    def __post_init__(self) -> None:
+        # encode once; apply() runs on every proxied upstream request
         userpass = f"{self.username}:{self.password}".encode("utf-8")
-        headers["Authorization"] = "Basic " + base64.b64encode(userpass).decode("ascii")
+        self._header = "Basic " + base64.b64encode(userpass).decode("ascii")
+
+    def apply(self, headers: Dict[str, str], params: Dict[str, str]) -> None:
+        headers["Authorization"] = self._header
 
     def __repr__(self) -> str:
         return f"BasicAuth(username={self.username!r}, password=***redacted***)"
@@ -109,12 +119,28 @@ class CredentialsResolver:
         * basic:    SECRET_<REF>_USER and SECRET_<REF>_PASS
         * api_key_: SECRET_<REF>_KEY (and header/query name must be provided)
     - Else raise ValueError with a helpful message.
+
+    The environment is snapshotted into a plain dict at construction and
+    resolved credentials are cached per AuthConfig (frozen, so hashable).
+    Call reload() to pick up changed secrets.
     """
 
     def __init__(self, env: Optional[Mapping[str, str]] = None) -> None:
-        self._env: Mapping[str, str] = env or os.environ
+        self._source = env
+        self._resolve_cached = lru_cache(maxsize=128)(self._resolve)
+        self.reload()
+
+    def resolve(self, cfg: AuthConfig) -> Credentials:
+        return self._resolve_cached(cfg)
+
+    def reload(self) -> None:
+        """Re-snapshot the environment and drop cached credentials."""
+        # explicit *_env names may point anywhere, so keep the whole mapping
+        source = os.environ if self._source is None else self._source
+        self._env: Dict[str, str] = dict(source)
+        self._resolve_cached.cache_clear()
 
-    def resolve(self, cfg: AuthConfig):
+    def _resolve(self, cfg: AuthConfig) -> Credentials:
         kind = cfg.kind.lower()
         if kind == "bearer":
             token = self._get_token(cfg)
@@ -0,0 +1,40 @@
+# app/routes/admin.py
+from __future__ import annotations
+import os
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from app.cache import layer_cache
+from app.database import list_tenants, refresh_tenants
+
+# ------------------------------------------------------------------------------
+# Admin endpoints. main.py only mounts this router when ADMIN_TOKEN is set;
+# every call must send the same value in the X-Admin-Token header.
+# ------------------------------------------------------------------------------
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not (
+        ADMIN_TOKEN
+        and x_admin_token
+        and secrets.compare_digest(x_admin_token, ADMIN_TOKEN)
+    ):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin_token)])  # prefix: /admin
+
+
+@router.post("/tenants/refresh")
+def refresh():
+    """Reload tenant DSNs (YAML + env) and rebuild the per-tenant engines."""
+    before = set(list_tenants())
+    tenants = refresh_tenants()
+    # cached bodies may come from a tenant's old DSN (or a removed tenant)
+    for slug in before.union(tenants):
+        layer_cache.invalidate(slug)
+    return {"tenants": tenants}
@@ -2,12 +2,13 @@
 from __future__ import annotations
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.crud import layers as crud
 from app.database import get_tenant_session
 from app.schemas.layers import Layer as LayerSchema
+from app.serialization import encode_layers
 
 router = APIRouter()  # no prefix here; set it in main.py
 
@@ -28,15 +29,9 @@ def get_config(
     Reads from the tenant's catalog DB only; no GIS data is queried here.
     """
     try:
-        items = crud.get_layers(db)
+        # one pass: cursor rows -> orjson, no ORM or pydantic objects
+        body = encode_layers(crud.iter_layer_batches(db, viewer_id, include_hidden))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load layers: {e}")
 
-    if viewer_id is not None:
-        items = [lyr for lyr in items if lyr.viewer_id == viewer_id]
-
-    if not include_hidden:
-        items = [lyr for lyr in items if (lyr.visible is None) or (lyr.visible is True)]
-
-    items.sort(key=lambda l: ((lyr_sort := (l.sort_order or 0)), l.id))
-    return items
+    return Response(body, media_type="application/json")
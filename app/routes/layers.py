@@ -1,33 +1,105 @@
 from __future__ import annotations
+from functools import partial
+import hashlib
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
+from app.cache import layer_cache
 from app.crud import layers as crud
-from app.database import get_tenant_session
+from app.database import get_tenant_session, tenant_session
 from app.schemas.layers import Layer, LayerCreate, LayerUpdate
+from app.serialization import encode_layer, encode_layers
 
 router = APIRouter()  # prefix is set in main.py: /tenants/{tenant}/layers
 
 
+def _encode_layers(tenant: str) -> bytes:
+    # Rows go straight from the cursor into orjson (see app/serialization.py).
+    # A StreamingResponse can't drain the cursor: the session must be closed
+    # before the body is sent.
+    with tenant_session(tenant) as db:
+        return encode_layers(crud.iter_layer_batches(db))
+
+
+def _encode_layers_by_id(tenant: str, layer_ids: List[int]) -> bytes:
+    with tenant_session(tenant) as db:
+        return encode_layers([crud.get_layer_rows(db, layer_ids)])
+
+
+def _encode_layer(tenant: str, layer_id: int) -> Optional[bytes]:
+    with tenant_session(tenant) as db:
+        row = crud.get_layer_row(db, layer_id)
+    return encode_layer(row) if row else None
+
+
+def _json_response(request: Request, body: bytes) -> Response:
+    # Strong ETag over the body; a polling client that sends it back in
+    # If-None-Match gets an empty 304 instead of the full payload.
+    etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+    headers = {"ETag": etag}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+# GETs are served from layer_cache and only open a DB session on a miss; every
+# write below invalidates the tenant's entries.
+# response_model only documents the shape; returning a Response skips
+# FastAPI's per-item validation and serialization.
+#
+# The GETs are async so cache hits are answered on the event loop without a
+# threadpool hop; misses run the blocking DB read in the threadpool.
 @router.get("/", response_model=list[Layer])
-def list_layers(tenant: str, db: Session = Depends(get_tenant_session)):
-    return crud.get_layers(db)
+async def list_layers(
+    tenant: str,
+    request: Request,
+    ids: Optional[List[int]] = Query(
+        None,
+        description="Only these layer ids (?ids=1&ids=2), fetched in one query; "
+        "unknown ids are skipped",
+    ),
+):
+    if ids:
+        layer_ids = sorted(set(ids))
+        key = "ids:" + ",".join(map(str, layer_ids))
+        load = partial(_encode_layers_by_id, tenant, layer_ids)
+    else:
+        key, load = "list", partial(_encode_layers, tenant)
+    body = await layer_cache.get_or_load(tenant, key, load)
+    return _json_response(request, body)
 
 
 @router.get("/{layer_id}", response_model=Layer)
-def get_layer(layer_id: int, tenant: str, db: Session = Depends(get_tenant_session)):
-    layer = crud.get_layer(db, layer_id)
-    if not layer:
+async def get_layer(layer_id: int, tenant: str, request: Request):
+    body = await layer_cache.get_or_load(
+        tenant, f"layer:{layer_id}", lambda: _encode_layer(tenant, layer_id)
+    )
+    if body is None:
         raise HTTPException(status_code=404, detail="Layer not found")
-    return layer
+    return _json_response(request, body)
 
 
 @router.post("/", response_model=Layer)
 def create_layer(
     layer: LayerCreate, tenant: str, db: Session = Depends(get_tenant_session)
 ):
-    return crud.create_layer(db, layer)
+    db_layer = crud.create_layer(db, layer)
+    layer_cache.invalidate(tenant)
+    return db_layer
+
+
+@router.post("/bulk", response_model=list[Layer])
+def create_layers_bulk(
+    layers: list[LayerCreate], tenant: str, db: Session = Depends(get_tenant_session)
+):
+    db_layers = crud.create_layers_bulk(db, layers)
+    layer_cache.invalidate(tenant)
+    return db_layers
 
 
 @router.put("/{layer_id}", response_model=Layer)
@@ -38,6 +110,7 @@ def update_layer(
     db: Session = Depends(get_tenant_session),
 ):
     db_layer = crud.update_layer(db, layer_id, layer)
+    layer_cache.invalidate(tenant)
     if not db_layer:
         raise HTTPException(status_code=404, detail="Layer not found")
     return db_layer
@@ -46,6 +119,7 @@ def update_layer(
 @router.delete("/{layer_id}", response_model=Layer)
 def delete_layer(layer_id: int, tenant: str, db: Session = Depends(get_tenant_session)):
     db_layer = crud.delete_layer(db, layer_id)
+    layer_cache.invalidate(tenant)
     if not db_layer:
         raise HTTPException(status_code=404, detail="Layer not found")
     return db_layer
@@ -1,10 +1,13 @@
 from datetime import datetime
 from typing import Any, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class LayerBase(BaseModel):
+    # Request/response values are never mutated after validation.
+    model_config = ConfigDict(frozen=True)
+
     viewer_id: Optional[int] = None
     type: str
     name: str
@@ -38,5 +41,4 @@ class Layer(LayerBase):
     id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
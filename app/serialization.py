@@ -0,0 +1,63 @@
+# app/serialization.py
+from __future__ import annotations
+from typing import Any, Iterable, Mapping, Sequence
+
+import orjson
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+
+from app.schemas.layers import Layer
+
+# ------------------------------------------------------------------------------
+# JSON encoding of layer rows read back from the catalog DB.
+#
+# Trust boundary: rows in the layers table were validated on the way in
+# (LayerCreate/LayerUpdate), so read responses encode the raw column mappings
+# with orjson in a single pass and never build pydantic models.
+#
+# Schema defaults fill in fields the table doesn't have (e.g. style), so the
+# JSON has the same keys as the Layer schema. OPT_UTC_Z writes UTC datetimes
+# with a trailing Z, as pydantic does.
+#
+# JSON columns (layer_params, extra_config, bbox) are selected as text and
+# wrapped in orjson.Fragment (RawJSON below), so the stored JSON is copied into
+# the response as-is instead of being parsed into dicts and encoded again.
+# ------------------------------------------------------------------------------
+
+LAYER_DEFAULTS = {
+    name: field.default
+    for name, field in Layer.model_fields.items()
+    if not field.is_required()
+}
+ORJSON_OPTS = orjson.OPT_UTC_Z
+
+
+class RawJSON(TypeDecorator):
+    """Result type for a JSON column cast to text: yields orjson.Fragment."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else orjson.Fragment(value)
+
+
+def dumps(payload: Any) -> bytes:
+    return orjson.dumps(payload, option=ORJSON_OPTS)
+
+
+def encode_layer(row: Mapping[str, Any]) -> bytes:
+    return dumps({**LAYER_DEFAULTS, **row})
+
+
+def encode_layers(batches: Iterable[Sequence[Mapping[str, Any]]]) -> bytes:
+    """
+    Encode batches of rows as one JSON array, splicing per-batch arrays so
+    only one batch of row dicts is alive at a time.
+    """
+    chunks = [
+        dumps([{**LAYER_DEFAULTS, **row} for row in batch])[1:-1]
+        for batch in batches
+        if batch
+    ]
+    return b"[" + b",".join(chunks) + b"]"